@@ -17,15 +17,19 @@ that have been tested.
  
 '''
 
-from collections import OrderedDict
+# Modules needed only by bulkInsert() or find_mysql_path(),
+# such as tempfile, threading, shutil, and socket, are
+# imported in those methods. That keeps them out of the 
+# import time of scripts that never call those methods.
+
 from contextlib import contextmanager
 import csv
+import json
+from operator import itemgetter
 import os
 import re
-import socket
-import subprocess
-import tempfile
-from warnings import filterwarnings, resetwarnings
+import time
+from warnings import catch_warnings, simplefilter
 from pymysql_utils.utils_config_parser import UtilsConfigParser
 
 # Find out whether we are to use the C-based MySQLdb
@@ -34,8 +38,12 @@ from pymysql_utils.utils_config_parser import UtilsConfigParser
 # or not defined in pymysql_utils.cnf file, or if that file
 # is unavailable, use the default C-based mysqlclient:
 
+# Note: the config value is a string, so 'False' must be
+# parsed as a boolean; as a plain string it would be truthy:
+
 try:
-    FORCE_PYTHON_NATIVE  = UtilsConfigParser()['substrate']['FORCE_PYTHON_NATIVE']
+    FORCE_PYTHON_NATIVE  = UtilsConfigParser()['substrate'].getboolean('FORCE_PYTHON_NATIVE', 
+                                                                       fallback=False)
 except KeyError:
     FORCE_PYTHON_NATIVE = False
 
@@ -66,18 +74,63 @@ else:
     from MySQLdb.cursors import SSDictCursor as SSDictCursor
     mysql_api = MySQLdb
 
-# To check for variable being a string in both Python 2.7 and 3.x:
+# What convert_to_string() converts, and how. Decided once
+# here, rather than by probing for the types on every call:
 try:
-    eval('basestring')
+    _UNDECODED_STR_TYPES = (eval('unicode'),)
+    # Python 2.7 unicode --> str:
+    _to_native_str = lambda strLike: strLike.encode('UTF-8')
 except NameError:
-    # We are running Python 3:
-    basestring = str
+    # Python 3 byte string --> str:
+    _UNDECODED_STR_TYPES = (bytes, bytearray)
+    _to_native_str = lambda strLike: strLike.decode('UTF-8')
 
 class DupKeyAction:
     PREVENT = 0
     IGNORE  = 1
     REPLACE = 2
 
+# How bulkInsert() expresses each DupKeyAction in a
+# LOAD DATA statement...
+
+_LOAD_DATA_DUP_ACTION = {DupKeyAction.PREVENT : '', # trigger the MySQL default
+                         DupKeyAction.IGNORE  : 'IGNORE',
+                         DupKeyAction.REPLACE : 'REPLACE'
+                         }
+
+# ... and in a multi-row INSERT. LOAD DATA LOCAL INFILE 
+# skips rows with duplicate keys, issuing a warning. 
+# INSERT IGNORE matches that behavior:
+
+_INSERT_DUP_ACTION = {DupKeyAction.PREVENT : 'INSERT IGNORE',
+                      DupKeyAction.IGNORE  : 'INSERT IGNORE',
+                      DupKeyAction.REPLACE : 'REPLACE'
+                      }
+
+# Filled in by bulkInsert() with file name, dup action, 
+# table name, and column list. The CSV is written as UTF-8,
+# so MySQL is told so, rather than having it assume the
+# database's default character set:
+
+_LOAD_DATA_TEMPLATE = ("LOAD DATA LOCAL INFILE '%s' %s INTO TABLE %s CHARACTER SET utf8mb4 FIELDS TERMINATED BY ',' " +\
+                       "OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' %s")
+
+# How insert() stores list, dict, and set values. Sets
+# become JSON arrays:
+
+def _toJSON(val):
+    return json.dumps(list(val) if isinstance(val, set) else val)
+
+# Number of rows that _writeCSVRows() collects before
+# writing them to the pipe in one call:
+
+_CSV_WRITE_BATCH_ROWS = 1000
+
+# Types whose str() _stringifyList() may call without
+# guarding against UnicodeEncodeError:
+
+_STRINGIFY_SAFE_TYPES = frozenset((int, float, str, bool))
+
 # Cursor classes as per: 
 #    http://mysql-python.sourceforge.net/MySQLdb-1.2.2/public/MySQLdb.cursors.BaseCursor-class.html
 # Used to pass to query() method if desired:   
@@ -99,7 +152,27 @@ class MySQLDB(object):
     '''
 
     config_parser = None
+    # Path to the mysql client program; set by find_mysql_path():
+    mysql_loc = None
+    # Not used within this module; retained for callers. To
+    # merely test whether a string is all ASCII, str.isascii()
+    # is a single C-level scan and faster than searching with
+    # this pattern:
     NON_ASCII_CHARS_PATTERN = re.compile(r'[^\x00-\x7F]+')
+    
+    # bulkInsert() sends batches with fewer rows than this
+    # as a single multi-row INSERT via cursor.executemany().
+    # Larger batches are streamed to LOAD DATA LOCAL INFILE:
+    BULK_INSERT_THRESHOLD = 1000
+    
+    # Instances handed out by get_pooled(), keyed by
+    # (host, port, user, passwd, db, cursor_class, autocommit):
+    _pool = {}
+    # get_pooled() pings a pooled connection before handing
+    # it out only if it has been idle for longer than this
+    # many seconds. A connection in recent use is very likely
+    # still alive, and the ping would cost a round trip:
+    POOL_PING_IDLE_SECONDS = 30
 
     # ----------------------- Top-Level Housekeeping -------------------------
 
@@ -113,7 +186,8 @@ class MySQLDB(object):
                  user='root', 
                  passwd='', 
                  db='mysql',
-                 cursor_class=None):
+                 cursor_class=None,
+                 autocommit=True):
         '''
         Creates connection to the underlying MySQL database.
         This connection is maintained until method close()
@@ -122,6 +196,14 @@ class MySQLDB(object):
         Values must be one of Cursors.DICT, Cursors.SS_CURSOR,
         etc. See definition of class Cursors above. 
         
+        By default the connection is in autocommit mode: each
+        statement is committed by the server as it runs, and 
+        methods such as insert() or update() do not need to send
+        a separate COMMIT. Use transaction() to group several
+        statements. With autocommit=False, methods commit after
+        each statement, as they would in autocommit mode, but
+        at the cost of a COMMIT round trip.
+        
         @param host: MySQL host
         @type host: string
         @param port: MySQL host's port
@@ -134,6 +216,8 @@ class MySQLDB(object):
         @type db: string
         @param cursor_class: choice of how rows are returned
         @type cursor_class: Cursors
+        @param autocommit: whether to put the connection in autocommit mode
+        @type autocommit: bool
         @raise ValueError
         @raise RuntimeError if mysql client program not found.
     
@@ -145,13 +229,9 @@ class MySQLDB(object):
         
         # However, cannot have any of the connection parms None.
         # Get a list of parameter names whose values are None:
-        potential_offenders = OrderedDict({'host' : host,
-                                           'db' : db, 
-                                           'user' : user, 
-                                           'passwd' : passwd, 
-                                           'port' : port}
-                                          )
-        bad_parms = [none_parms for none_parms in potential_offenders.keys() if potential_offenders[none_parms] is None]
+        str_parms = (('host', host), ('db', db), ('user', user), ('passwd', passwd))
+        bad_parms = [parm_name for parm_name, parm_val in str_parms + (('port', port),) 
+                     if parm_val is None]
         # If 'host' and 'user' are None, we now have: ['host', 'user']
         # If none of the above parms is None, non_parms will be empty:
         if len(bad_parms) > 0:
@@ -163,10 +243,8 @@ class MySQLDB(object):
                 raise ValueError("Non-existing cursor class '%s'" % str(cursor_class))
         
         # Ensure proper data types: all but port must be strings:
-        del potential_offenders['port']
-        
-        type_offenders = [bad_type_parms for bad_type_parms in potential_offenders.keys() 
-                          if type(potential_offenders[bad_type_parms]) != str]
+        type_offenders = [parm_name for parm_name, parm_val in str_parms 
+                          if type(parm_val) != str]
         
         # OK for port to be an int:
         if len(type_offenders) > 0:
@@ -182,12 +260,32 @@ class MySQLDB(object):
         self.db   = db
         self.name = db
         self.host = host
+        self.cursor_class = cursor_class
+        # True if this instance is held in MySQLDB._pool:
+        self.pooled = False
+        # time.monotonic() when get_pooled() last handed
+        # out this instance:
+        self.pool_last_used = None
+        # True while inside a transaction() block:
+        self.in_transaction = False
         # Will hold querySt->cursor for two purposes:
         # Ability to retrieve number of results in SELECT,
         # Ensure that all cursors are closed (see query()):
         self.cursors = {}
+        # Reverse map id(cursor) --> queryStr, so that
+        # query_exhausted() can find a cursor's entry
+        # in self.cursors without scanning:
+        self._cursor_queries = {}
         self.most_recent_query = None
         self.connection = None
+        # Maps (tblName, colNameTuple) to the parameterized INSERT
+        # statement that insert() built for it:
+        self._insert_cmd_cache = {}
+        # Filled on first call to server_vars():
+        self._server_vars = None
+        # Cursor shared by the methods that return no rows;
+        # see _write_cursor():
+        self._shared_cursor = None
         
         # Find location of mysql client program.
         # Will raise error if not found.
@@ -201,6 +299,7 @@ class MySQLDB(object):
                                                     passwd=passwd, 
                                                     db=db,
                                                     charset='utf8',
+                                                    autocommit=autocommit,
                                                     local_infile=1)
             else:
                 self.connection = mysql_api.connect(host=host, 
@@ -210,6 +309,7 @@ class MySQLDB(object):
                                                     db=db,
                                                     charset='utf8',
                                                     cursorclass=cursor_class,
+                                                    autocommit=autocommit,
                                                     local_infile=1)
           
         except OperationalError as e:
@@ -223,6 +323,132 @@ class MySQLDB(object):
                              (host, port, user, pwd, db, repr(e)))
       
 
+    #-------------------------
+    # get_pooled 
+    #--------------
+    
+    @classmethod
+    def get_pooled(cls,
+                   host='127.0.0.1', 
+                   port=3306, 
+                   user='root', 
+                   passwd='', 
+                   db='mysql',
+                   cursor_class=None,
+                   autocommit=True):
+        '''
+        Like the constructor, but reuses a MySQLDB instance
+        created by an earlier call with the same arguments,
+        as long as that instance's connection is still alive. 
+        Saves the connection handshake for scripts that open
+        a connection for each of many small operations.
+        
+        The server is pinged only if the pooled connection has
+        been idle for more than POOL_PING_IDLE_SECONDS, so
+        back-to-back calls cost no round trip. Connections that
+        the driver found broken are replaced without a ping.
+        
+        Pooled instances are shared; don't hand the same 
+        instance to multiple threads. Using a pooled instance
+        in a with-statement leaves the connection open for
+        the next get_pooled() call.
+        
+        Parameters are as for the constructor.
+        
+        @return: an open MySQLDB instance
+        @rtype: MySQLDB
+        @raise ValueError
+        @raise RuntimeError if mysql client program not found.
+        '''
+        pool_key = (host, port, user, passwd, db, cursor_class, autocommit)
+        mysqldb = cls._pool.get(pool_key, None)
+        now = time.monotonic()
+        if mysqldb is not None and mysqldb.isOpen() and \
+           (now - mysqldb.pool_last_used <= cls.POOL_PING_IDLE_SECONDS or mysqldb.ping()):
+            mysqldb.pool_last_used = now
+            return mysqldb
+        
+        mysqldb = cls(host=host, 
+                      port=port, 
+                      user=user, 
+                      passwd=passwd, 
+                      db=db, 
+                      cursor_class=cursor_class,
+                      autocommit=autocommit)
+        mysqldb.pooled = True
+        mysqldb.pool_last_used = now
+        cls._pool[pool_key] = mysqldb
+        return mysqldb
+
+    #-------------------------
+    # clear_pool 
+    #--------------
+    
+    @classmethod
+    def clear_pool(cls):
+        '''
+        Close all instances that get_pooled() has handed
+        out, and empty the pool. Later get_pooled() calls
+        open new connections.
+        '''
+        for mysqldb in cls._pool.values():
+            mysqldb.close()
+        cls._pool.clear()
+
+    #-------------------------
+    # __enter__ 
+    #--------------
+    
+    def __enter__(self):
+        return self
+    
+    #-------------------------
+    # __exit__ 
+    #--------------
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        '''
+        Close the connection, unless this instance came from
+        get_pooled(). In that case the connection stays
+        open for reuse.
+        '''
+        if not self.pooled:
+            self.close()
+        # Don't suppress exceptions:
+        return False
+
+    #-------------------------
+    # transaction 
+    #--------------
+    
+    @contextmanager
+    def transaction(self):
+        '''
+        Context manager that runs the enclosed statements
+        as one transaction. Commits when the block is left
+        normally, and rolls back if the block raises an 
+        exception. Example::
+        
+            with mysqldb.transaction():
+                mysqldb.insert('myTbl', {'col1' : 10})
+                mysqldb.update('myTbl', 'col2', 'foo', 'col1 = 10')
+        '''
+        if self.in_transaction:
+            # Nested: the outer block commits or rolls back:
+            yield self
+            return
+        self.connection.begin()
+        self.in_transaction = True
+        try:
+            yield self
+        except Exception:
+            self.connection.rollback()
+            raise
+        else:
+            self.connection.commit()
+        finally:
+            self.in_transaction = False
+
     #-------------------------
     # dbName 
     #--------------
@@ -262,6 +488,12 @@ class MySQLDB(object):
                 cursor.close()
             except:
                 pass
+        if self._shared_cursor is not None:
+            try:
+                self._shared_cursor.close()
+            except:
+                pass
+            self._shared_cursor = None
         try:
             self.connection.close()
         except:
@@ -280,7 +512,59 @@ class MySQLDB(object):
             return self.connection.open != 0
         else:
             return False
+
+    #-------------------------
+    # ping
+    #--------------
+    
+    def ping(self):
+        '''
+        Check whether the server still responds on this
+        connection. Unlike isOpen(), this detects connections
+        that the server dropped, e.g. after a long idle time.
+        
+        @return: True if the server responded, else False
+        @rtype: bool
+        '''
+        try:
+            self.connection.ping()
+            return True
+        except Exception:
+            return False
       
+    #-------------------------
+    # server_vars
+    #--------------
+    
+    def server_vars(self):
+        '''
+        Return the server variables that limit how statements
+        and data can be batched: max_allowed_packet, 
+        bulk_insert_buffer_size, local_infile, and net_buffer_length.
+        The server is asked on the first call only; later calls
+        return the cached values. Numeric values are ints.
+        
+        @return: mapping of variable name to value
+        @rtype: {str : {int | str}}
+        '''
+        if self._server_vars is not None:
+            return self._server_vars
+        
+        # Use a plain cursor, so that rows are tuples
+        # even on dict-cursor connections:
+        cursor = self.connection.cursor(mysql_api.cursors.Cursor)
+        try:
+            cursor.execute("SHOW VARIABLES WHERE Variable_name IN " +\
+                           "('max_allowed_packet','bulk_insert_buffer_size'," +\
+                           "'local_infile','net_buffer_length')")
+            server_vars = {}
+            for (var_name, value) in cursor.fetchall():
+                server_vars[var_name] = int(value) if value.isdigit() else value
+        finally:
+            cursor.close()
+        self._server_vars = server_vars
+        return server_vars
+
     # ----------------------- Table Management -------------------------
 
     #-------------------------
@@ -299,18 +583,17 @@ class MySQLDB(object):
         @type schema: Dict<String,String>
         @raise: ValueError: if table to truncate does not exist or permissions issues.        
         '''
-        colSpec = ''
-        for colName, colVal in schema.items():
-            colSpec += str(colName) + ' ' + str(colVal) + ','
-        cmd = 'CREATE %s TABLE IF NOT EXISTS %s (%s) ' % (
-            'TEMPORARY' if temporary else '',
+        colSpec = ','.join('%s %s' % (colName, colVal) for colName, colVal in schema.items())
+        cmd = 'CREATE %sTABLE IF NOT EXISTS %s (%s)' % (
+            'TEMPORARY ' if temporary else '',
             tableName, 
-            colSpec[:-1]
+            colSpec
             )
         cursor = self.connection.cursor()
         try:
-            cursor.execute(cmd)
-            self.connection.commit()
+            with no_warn_no_table():
+                cursor.execute(cmd)
+            self._commit()
         finally:
             cursor.close()
 
@@ -331,7 +614,7 @@ class MySQLDB(object):
             # Suppress warning about table not existing:
             with no_warn_no_table():
                 cursor.execute('DROP TABLE IF EXISTS %s' % tableName)
-            self.connection.commit()
+            self._commit()
         except OperationalError as e:
             raise ValueError("In pymysql_utils dropTable(): %s" % repr(e))
         except ProgrammingError as e:
@@ -354,12 +637,13 @@ class MySQLDB(object):
         cursor = self.connection.cursor()
         try:
             try:
-                cursor.execute('TRUNCATE TABLE %s' % tableName)
+                with no_db_warnings():
+                    cursor.execute('TRUNCATE TABLE %s' % tableName)
             except OperationalError as e:
                 raise ValueError("In pymysql_utils truncateTable(): %s." % repr(e))
             except ProgrammingError as e:
                 raise ValueError("In pymysql_utils truncateTable(): %s." % repr(e))
-            self.connection.commit()
+            self._commit()
         finally:
             cursor.close()
 
@@ -372,7 +656,8 @@ class MySQLDB(object):
     def insert(self, tblName, colnameValueDict):
         '''
         Given a dictionary mapping column names to column values,
-        insert the data into a specified table
+        insert the data into a specified table. Values that are
+        lists, dicts, or sets are stored as JSON strings.
 
         @param tblName: name of table to insert into
         @type tblName: String
@@ -382,34 +667,44 @@ class MySQLDB(object):
         @rtype: {(None,None) | ({ (str) | None},{ (str) | None})}        
         '''
 
+        # Nothing to insert; don't involve the server:
+        if not colnameValueDict:
+            return (None,None)
+
         errors   = []
         warnings = []
         mysql_warnings = []
 
         colNames, colValues = zip(*colnameValueDict.items())
-        cursor = self.connection.cursor()
+        cursor = self._write_cursor()
         try:
-            wellTypedColValues = self._ensureSQLTyping(colValues)
-            cmd = 'INSERT INTO %s (%s) VALUES (%s)' % (str(tblName), ','.join(colNames), wellTypedColValues)
+            # Let the driver escape and quote the values.
+            # Lists, dicts, and sets are stored as JSON, which
+            # is readable outside of Python, and can go into
+            # MySQL JSON columns:
+            colValues = [_toJSON(val) if isinstance(val, (list, dict, set)) else val
+                         for val in colValues]
+            try:
+                cmd = self._insert_cmd_cache[(tblName, colNames)]
+            except KeyError:
+                cmd = 'INSERT INTO %s (%s) VALUES (%s)' % (str(tblName), 
+                                                           ','.join(colNames),
+                                                           ','.join(['%s'] * len(colNames)))
+                self._insert_cmd_cache[(tblName, colNames)] = cmd
+            failed = False
             with no_db_warnings():
                 try:
-                    cursor.execute(cmd)
+                    cursor.execute(cmd, colValues)
                 except Exception:
                     # The following show_warnings() will
                     # reveal the error:
-                    pass
-            mysql_warnings = self.connection.show_warnings()
+                    failed = True
+            mysql_warnings = self._fetch_warnings(cursor, failed)
             if len(mysql_warnings) > 0:
-                warnings   = [warning_tuple for warning_tuple in mysql_warnings if warning_tuple[0] == 'Warning']
-                errors     = [error_tuple for error_tuple in mysql_warnings if error_tuple[0] == 'Error']
-                if len(warnings) == 0:
-                    warnings = None
-                if len(errors) == 0:
-                    errors = None                
+                (errors, warnings) = self._split_warnings(mysql_warnings)
         finally:
-            self.connection.commit()
-            cursor.close()
-            return (None,None) if len(mysql_warnings) == 0 else (errors, warnings)            
+            self._commit()
+        return (None,None) if len(mysql_warnings) == 0 else (errors, warnings)
     
     #-------------------------
     # bulkInsert 
@@ -428,8 +723,13 @@ class MySQLDB(object):
         
         Strategy: 
         
-        write the values to a temp file, then generate a 
-        ``LOAD LOCAL INFILE...`` MySQL command and execute it in MySQL. 
+        for fewer than MySQLDB.BULK_INSERT_THRESHOLD rows, hand
+        the rows to the driver's executemany(), which sends them
+        as one multi-row INSERT. For larger batches, create a 
+        named pipe, and have a separate thread write the values 
+        into it as CSV, while a ``LOAD LOCAL INFILE...`` MySQL 
+        command reads from the pipe. Where named pipes are not
+        available, the CSV goes to a temp file first. 
         Returns `None` if no errors/warnings, else returns the tuple
         of tuples with the warnings.
                 
@@ -458,74 +758,237 @@ class MySQLDB(object):
         
         '''
 
+        if onDupKey not in _LOAD_DATA_DUP_ACTION:
+            raise ValueError("Parameter onDupKey to bulkInsert method must be of type DupKeyAction; is %s" % str(onDupKey))
+
+        # Nothing to insert; don't involve the server:
+        if len(valueTupleArray) == 0:
+            return (None,None)
+
+        if len(valueTupleArray) < MySQLDB.BULK_INSERT_THRESHOLD:
+            return self._bulkInsertMultiRow(tblName, colNameTuple, valueTupleArray, onDupKey)
+
         errors   = []
         warnings = []
 
-        tmpCSVFile = tempfile.NamedTemporaryFile(dir='/tmp',prefix='bulkInsert',suffix='.csv',mode='w')
-        # Allow MySQL to read this tmp file:
-        os.chmod(tmpCSVFile.name, 0o644)
-        self.csvWriter = csv.writer(tmpCSVFile, 
-                                    dialect='excel-tab', 
-                                    lineterminator='\n', 
-                                    delimiter=',', 
-                                    quotechar='"', 
-                                    quoting=csv.QUOTE_MINIMAL)
-        # Can't use csvWriter.writerows() b/c some rows have 
-        # weird chars: self.csvWriter.writerows(valueTupleArray)        
-        for row in valueTupleArray:
-            # Convert each element in row to a string,
-            # including mixed-in Unicode Strings:
-            clean_row = [rowElement for rowElement in self._stringifyList(row)]
-            self.csvWriter.writerow(clean_row)
-        tmpCSVFile.flush()
+        import shutil
+        import tempfile
+        import threading
+        
+        # Run the load in a transaction of its own, even in
+        # autocommit mode, so that it can be rolled back if 
+        # the rows cannot all be written:
+        own_transaction = not self.in_transaction
+        if own_transaction:
+            self.connection.begin()
+        
+        # Stream the rows to MySQL through a named pipe rather
+        # than a temp file. A writer thread produces the CSV while 
+        # LOAD DATA LOCAL INFILE consumes it, so the data never
+        # goes to disk. The thread opens the pipe itself. That open
+        # blocks until MySQL opens the read end, so the writer 
+        # cannot finish before MySQL starts reading. Where named
+        # pipes are not available (Windows), write a temp file first:
+        tmpDir  = tempfile.mkdtemp(prefix='bulkInsert')
+        csvPath = os.path.join(tmpDir, 'bulkInsert.csv')
+        
+        # Exceptions raised while writing the CSV:
+        writerErrors = []
+        writerThread = None
+        if hasattr(os, 'mkfifo'):
+            os.mkfifo(csvPath, 0o644)
+            # Set once the writer has its end of the pipe open:
+            writerOpened = threading.Event()
+            writerThread = threading.Thread(target=self._writeCSVRows,
+                                            args=(csvPath, valueTupleArray, writerErrors, writerOpened))
+            writerThread.daemon = True
+            writerThread.start()
+        else:
+            self._writeCSVRows(csvPath, valueTupleArray, writerErrors)
         
         # Create the MySQL column name list needed in the LOAD INFILE below.
         # We need '(colName1,colName2,...)':
-        if len(colNameTuple) == 0:
-            colSpec = '()'
-        else:
-            colSpec = '(' + colNameTuple[0]
-            for colName in colNameTuple[1:]:
-                colSpec += ',' + colName
-            colSpec += ')'
+        colSpec = '(' + ','.join(colNameTuple) + ')'
 
         # For warnings from MySQL:
         mysql_warnings = ''
+        cursor = self.connection.cursor()
         try:
-            if onDupKey == DupKeyAction.PREVENT:
-                dupAction = '' # trigger the MySQL default
-            elif onDupKey == DupKeyAction.IGNORE:
-                dupAction = 'IGNORE'
-            elif onDupKey == DupKeyAction.REPLACE:
-                dupAction = 'REPLACE'
-            else:
-                raise ValueError("Parameter onDupKey to bulkInsert method must be of type DupKeyAction; is %s" % str(onDupKey))
-            
-            # Remove quotes from the values inside the colNameTuple's:
-            mySQLCmd = ("LOAD DATA LOCAL INFILE '%s' %s INTO TABLE %s FIELDS TERMINATED BY ',' " +\
-                        "OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' %s"
-                        ) %  (tmpCSVFile.name, dupAction, tblName, colSpec)
-            cursor = self.connection.cursor()
+            # MySQL would read backslashes in the file name as
+            # escapes; on Windows it accepts '/' as well:
+            mySQLCmd = _LOAD_DATA_TEMPLATE % (csvPath.replace('\\', '/'), 
+                                              _LOAD_DATA_DUP_ACTION[onDupKey], 
+                                              tblName, 
+                                              colSpec)
+            failed = False
             with no_db_warnings():
                 try:
                     cursor.execute(mySQLCmd)
                 except Exception:
                     # The following show_warnings() will
                     # reveal the error:
-                    pass
-            mysql_warnings = self.connection.show_warnings()
+                    failed = True
+            mysql_warnings = self._fetch_warnings(cursor, failed)
             if len(mysql_warnings) > 0:
-                warnings   = [warning_tuple for warning_tuple in mysql_warnings if warning_tuple[0] == 'Warning']
-                errors     = [error_tuple for error_tuple in mysql_warnings if error_tuple[0] == 'Error']
-                if len(warnings) == 0:
-                    warnings = None
-                if len(errors) == 0:
-                    errors = None
+                (errors, warnings) = self._split_warnings(mysql_warnings)
+        except Exception:
+            # E.g. a lost connection. Don't leave our
+            # transaction open, but let the original 
+            # error propagate:
+            if own_transaction:
+                try:
+                    self.connection.rollback()
+                except Exception:
+                    pass
+            raise
         finally:
-            tmpCSVFile.close()
-            self.execute('commit;')
-            return (None,None) if len(mysql_warnings) == 0 else (errors, warnings)            
+            if writerThread is not None:
+                self._releaseCSVWriter(csvPath, writerThread, writerOpened)
+            shutil.rmtree(tmpDir, ignore_errors=True)
+            try:
+                cursor.close()
+            except:
+                pass
+            
+        if len(writerErrors) > 0:
+            # MySQL only saw part of the rows; don't
+            # keep them:
+            if own_transaction:
+                self.connection.rollback()
+            raise writerErrors[0]
+        if own_transaction:
+            self.connection.commit()
+        return (None,None) if len(mysql_warnings) == 0 else (errors, warnings)
+    
+    #-------------------------
+    # _writeCSVRows 
+    #--------------
     
+    def _writeCSVRows(self, csvPath, valueTupleArray, writerErrors, opened=None):
+        '''
+        Writes the rows as CSV to the given path for bulkInsert().
+        Usually runs in a separate thread, and the path is the
+        named pipe read by LOAD DATA LOCAL INFILE. Opening the 
+        pipe then blocks until a reader opens it, too. Closing
+        it when done signals end of file to the reader.
+        
+        @param csvPath: named pipe or file to write
+        @type csvPath: str
+        @param valueTupleArray: rows to write
+        @type valueTupleArray: [(<any>)]
+        @param writerErrors: list to which exceptions are appended
+        @type writerErrors: [Exception]
+        @param opened: if provided, set once csvPath is open, or
+            could not be opened
+        @type opened: threading.Event
+        '''
+        try:
+            # Encode once, in C, as the text goes into the pipe;
+            # don't depend on the locale's default encoding:
+            with open(csvPath, 'w', encoding='utf-8', newline='') as fifo:
+                if opened is not None:
+                    opened.set()
+                csvWriter = csv.writer(fifo, 
+                                       dialect='excel-tab', 
+                                       lineterminator='\n', 
+                                       delimiter=',', 
+                                       quotechar='"', 
+                                       quoting=csv.QUOTE_MINIMAL)
+                # Fast lane: most rows hold only numbers and strings
+                # without commas, quotes, or line breaks. Such rows
+                # need no quoting, so a plain join produces the same
+                # CSV line as csvWriter. Collect those lines, and
+                # write them a batch at a time. Bounded batches keep
+                # memory flat, and let MySQL start reading early:
+                cleanLines = []
+                for row in valueTupleArray:
+                    if None not in row:
+                        line = ','.join(map(str, row))
+                        if line and \
+                           line.count(',') == len(row) - 1 and \
+                           '"' not in line and \
+                           '\n' not in line and \
+                           '\r' not in line:
+                            cleanLines.append(line)
+                            if len(cleanLines) >= _CSV_WRITE_BATCH_ROWS:
+                                cleanLines.append('')
+                                fifo.write('\n'.join(cleanLines))
+                                cleanLines = []
+                            continue
+                    # Row needs the CSV writer. Flush pending clean
+                    # lines first to preserve order:
+                    if cleanLines:
+                        cleanLines.append('')
+                        fifo.write('\n'.join(cleanLines))
+                        cleanLines = []
+                    # Convert each element to a string, including
+                    # mixed-in Unicode strings, and None to NULL:
+                    csvWriter.writerow(self._stringifyList(row))
+                if cleanLines:
+                    cleanLines.append('')
+                    fifo.write('\n'.join(cleanLines))
+        except Exception as e:
+            writerErrors.append(e)
+        finally:
+            if opened is not None:
+                opened.set()
+
+    #-------------------------
+    # _releaseCSVWriter 
+    #--------------
+    
+    def _releaseCSVWriter(self, fifoPath, writerThread, writerOpened):
+        '''
+        Called by bulkInsert() after LOAD DATA ended. If MySQL
+        never opened the named pipe, e.g. because of a bad column
+        name, the writer thread is still waiting to open it. Open
+        a read end of our own, and discard whatever the writer 
+        produces, until it is done.
+        
+        @param fifoPath: the named pipe
+        @type fifoPath: str
+        @param writerThread: thread running _writeCSVRows()
+        @type writerThread: threading.Thread
+        @param writerOpened: event set by the writer once it has the pipe open
+        @type writerOpened: threading.Event
+        '''
+        # A non-blocking open succeeds without a writer, and 
+        # lets a writer waiting in its open() proceed:
+        drainFd = os.open(fifoPath, os.O_RDONLY | os.O_NONBLOCK)
+        try:
+            # Before the writer has its end open, a read would
+            # report end of file. Our read end guarantees that 
+            # the writer's open() returns. Don't wait for a
+            # thread that died:
+            while not writerOpened.wait(0.1):
+                if not writerThread.is_alive():
+                    break
+            os.set_blocking(drainFd, True)
+            while os.read(drainFd, 65536):
+                pass
+        finally:
+            os.close(drainFd)
+        writerThread.join()
+
+    #-------------------------
+    # _bulkInsertMultiRow 
+    #--------------
+    
+    def _bulkInsertMultiRow(self, tblName, colNameTuple, valueTupleArray, onDupKey):
+        '''
+        Small-batch path of bulkInsert(). Sends all rows as 
+        one multi-row INSERT via cursor.executemany(). The driver
+        does the value escaping, so no temp file and no Python-side
+        CSV quoting are needed. Parameters and return value are
+        as for bulkInsert().
+        '''
+
+        mySQLCmd = '%s INTO %s (%s) VALUES (%s)' % (_INSERT_DUP_ACTION[onDupKey], 
+                                                    tblName, 
+                                                    ','.join(colNameTuple),
+                                                    ','.join(['%s'] * len(colNameTuple)))
+        return self.executemany(mySQLCmd, valueTupleArray)
+
     #-------------------------
     # update 
     #--------------
@@ -552,52 +1015,102 @@ class MySQLDB(object):
         errors   = []
         warnings = []
 
-        cursor = self.connection.cursor()
+        cursor = self._write_cursor()
         try:
-            if fromCondition is None:
-                if newVal is None:
-                    # The double-% causes the '%s' to be retained
-                    # in the update string. The underlying mysqldb
-                    # package will substitute that later for None.
-                    # I.e.: create a two-tuple:
-                    #
-                    #   ('UPDATE unittest SET col1 = %s', (None,))
-                    #
-                    cmd = ("UPDATE %s SET %s = %%s" % (tblName,colName), (None,))
-                else:
-                    cmd = "UPDATE %s SET %s = '%s';" % (tblName,colName,newVal)
-            else:
-                if newVal is None:
-                    # See above for explanation of double-%:
-                    cmd = ("UPDATE %s SET %s = %%s WHERE %s;" % (tblName,colName,fromCondition), (None,))
-                else:
-                    cmd = "UPDATE %s SET %s = '%s' WHERE %s;" % (tblName,colName,newVal,fromCondition)
+            # The double-% causes the '%s' to be retained
+            # in the update string. The driver substitutes
+            # newVal for it, escaping and quoting as needed:
+            #
+            #   'UPDATE unittest SET col1 = %s', (newVal,)
+            #
+            cmd = "UPDATE %s SET %s = %%s" % (tblName,colName)
+            if fromCondition is not None:
+                # Percent signs in the condition, as in LIKE 
+                # patterns, must survive the parameter substitution:
+                cmd += " WHERE %s" % fromCondition.replace('%', '%%')
+            failed = False
             with no_db_warnings():
                 try:
-                    # If setting to None, cmd will be a tuple
-                    # with the %s-notation UPDATE string first,
-                    # and the values second:
-                    if newVal is None:
-                        cursor.execute(cmd[0], cmd[1])
-                    else:
-                        cursor.execute(cmd)
+                    cursor.execute(cmd, (newVal,))
                 except Exception:
                     # The following show_warnings() will
                     # reveal the error:
-                    pass
-            mysql_warnings = self.connection.show_warnings()
+                    failed = True
+            mysql_warnings = self._fetch_warnings(cursor, failed)
             if len(mysql_warnings) > 0:
-                warnings   = [warning_tuple for warning_tuple in mysql_warnings if warning_tuple[0] == 'Warning']
-                errors     = [error_tuple for error_tuple in mysql_warnings if error_tuple[0] == 'Error']
-                if len(warnings) == 0:
-                    warnings = None
-                if len(errors) == 0:
-                    errors = None
+                (errors, warnings) = self._split_warnings(mysql_warnings)
 
         finally:
-            self.connection.commit()            
-            cursor.close()
-            return (None,None) if len(mysql_warnings) == 0 else (errors, warnings)            
+            self._commit()
+        return (None,None) if len(mysql_warnings) == 0 else (errors, warnings)
+
+    #-------------------------
+    # update_many 
+    #--------------
+    
+    def update_many(self, tblName, keyCol, setCol, keyValuePairs):
+        '''
+        Update one column in many rows, each row getting its
+        own new value. Rows are identified by the value in
+        column keyCol. All updates travel to MySQL in a single
+        statement of the form::
+        
+            UPDATE tbl SET setCol = CASE keyCol WHEN k1 THEN v1 
+                                                WHEN k2 THEN v2 ... END
+             WHERE keyCol IN (k1, k2, ...)
+             
+        rather than as one UPDATE per row. Keys not present in
+        the table are ignored, as with update(). Example::
+        
+            update_many('myTable', 'id', 'col1', [(1, 'foo'), (2, 'bar')])
+            
+        @param tblName: name of table in which update is to occur
+        @type tblName: String
+        @param keyCol: column whose value identifies each row
+        @type keyCol: String
+        @param setCol: column whose value is to be changed
+        @type setCol: String
+        @param keyValuePairs: (key, newValue) pairs; None new values
+            are stored as NULL
+        @type keyValuePairs: [(<any>, <any>)]
+        @return (None,None) if all ok, else tuple (errorList, warningsList)
+        @rtype {(None,None) | ([str],[str])}
+        '''
+
+        errors   = []
+        warnings = []
+        mysql_warnings = []
+        
+        keyValuePairs = list(keyValuePairs)
+        if len(keyValuePairs) == 0:
+            return (None,None)
+
+        cmd = 'UPDATE %s SET %s = CASE %s %s END WHERE %s IN (%s)' % \
+            (tblName, 
+             setCol, 
+             keyCol, 
+             ' '.join(['WHEN %s THEN %s'] * len(keyValuePairs)),
+             keyCol,
+             ','.join(['%s'] * len(keyValuePairs)))
+        params = [pair_el for pair in keyValuePairs for pair_el in pair] + \
+                 [key for (key, _newVal) in keyValuePairs]
+
+        cursor = self._write_cursor()
+        try:
+            failed = False
+            with no_db_warnings():
+                try:
+                    cursor.execute(cmd, params)
+                except Exception:
+                    # The following show_warnings() will
+                    # reveal the error:
+                    failed = True
+            mysql_warnings = self._fetch_warnings(cursor, failed)
+            if len(mysql_warnings) > 0:
+                (errors, warnings) = self._split_warnings(mysql_warnings)
+        finally:
+            self._commit()
+        return (None,None) if len(mysql_warnings) == 0 else (errors, warnings)
 
     # ----------------------- Queries -------------------------
         
@@ -605,7 +1118,7 @@ class MySQLDB(object):
     # query 
     #--------------
     
-    def query(self, queryStr):
+    def query(self, queryStr, stream=False, chunksize=None):
         '''
         Query iterator. Given a query, return one result for each
         subsequent call. When all results have been retrieved,
@@ -614,9 +1127,27 @@ class MySQLDB(object):
         IMPORTANT: what is returned is an *iterator*. So you
         need to call next() to get the first result, even if
         there is only one.
+        
+        If stream is True, a server-side cursor is used: rows
+        are fetched from the server as the iterator advances,
+        rather than all being loaded into memory up front. Use
+        this for large result sets. Caveats: result_count() is 
+        unreliable for streamed queries, since MySQL has not yet
+        counted the rows. And the result must be exhausted (or
+        the MySQLDB closed) before the next query is issued on
+        this connection.
+        
+        The iterator obtains rows from the cursor chunksize
+        at a time; by default QueryResult.FETCH_BATCH_SIZE.
+        Larger chunks mean fewer round trips when streaming,
+        at the cost of memory.
 
         @param queryStr: the query to submit to MySQL
         @type queryStr: String
+        @param stream: whether to stream rows from the server
+        @type stream: bool
+        @param chunksize: number of rows to fetch at a time
+        @type chunksize: int
         @return: iterator of query results
         @rtype: iterator of tuples
         @raise ValueError on MySQL errors.
@@ -624,27 +1155,37 @@ class MySQLDB(object):
 
         # The str/byte/unicode type mess between
         # Python 2.7 and 3.x. We want as 'normal'
-        # a string as possible. Surely there is a
-        # more elegant way:
+        # a string as possible. The usual case, a 
+        # Python 3 str, needs no conversion:
         
-        queryStr = self.convert_to_string(queryStr)
+        if not isinstance(queryStr, str):
+            queryStr = self.convert_to_string(queryStr)
        
         # For if caller never exhausts the results by repeated calls,
         # and to find cursor by query to get (e.g.) num results:
-        cursor = self.connection.cursor()
+        if stream:
+            # Keep dict-style results if the connection uses them:
+            if self.cursor_class in (DictCursor, SSDictCursor):
+                cursor = self.connection.cursor(SSDictCursor)
+            else:
+                cursor = self.connection.cursor(SSCursor)
+        else:
+            cursor = self.connection.cursor()
         
         # Ability to find an active cursor by query 
         # via result_count(queryString)...
         self.cursors[queryStr] = cursor
+        self._cursor_queries[id(cursor)] = queryStr
         
         #... or find it via  result_count()...
         self.most_recent_query = queryStr
 
         try:        
-            cursor.execute(queryStr)
+            with no_db_warnings():
+                cursor.execute(queryStr)
         except (ProgrammingError, OperationalError) as e:
             raise ValueError(repr(e))
-        return QueryResult(cursor, queryStr, self)
+        return QueryResult(cursor, queryStr, self, chunksize)
         
     #-------------------------
     # result_count 
@@ -711,32 +1252,31 @@ class MySQLDB(object):
             with no_db_warnings():
                 try:                                                                                                   
                     cursor.execute(query)
-                    # Eat any query results and discard them:
-                    cursor.fetchall()
                 except Exception as e:
                     # The following show_warnings() will
                     # reveal the error:
                     mysql_warnings = self.connection.show_warnings()
-        finally:                                                                                               
-            if doCommit:
-                self.connection.commit()
+        finally:
             try:
+                # Closing the cursor discards any query
+                # results (including further result sets)
+                # without copying them into a list first.
+                # Close before committing so that unread
+                # rows of unbuffered cursors don't leave
+                # the connection out of sync.
                 # If the above MySQL call had an error,
-                # it will generate an exception when 
+                # it will generate an exception when
                 # close the cursor. But that error info
                 # will be caught in the show_warnings()
                 # below; so ignore it here:
                 cursor.close()
             except Exception as e:
                 pass
+            if doCommit:
+                self._commit()
 
         if len(mysql_warnings) > 0:
-            warnings   = [warning_tuple for warning_tuple in mysql_warnings if warning_tuple[0] == 'Warning']
-            errors     = [error_tuple for error_tuple in mysql_warnings if error_tuple[0] == 'Error']
-            if len(warnings) == 0:
-                warnings = None
-            if len(errors) == 0:
-                errors = None
+            (errors, warnings) = self._split_warnings(mysql_warnings)
         return(None,None) if len(mysql_warnings) == 0 else (errors, warnings)
 
     #-------------------------
@@ -767,27 +1307,89 @@ class MySQLDB(object):
 
         errors   = []
         warnings = []
-        cursor=self.connection.cursor()                                                                        
+        cursor = self._write_cursor()
         try:                                                                                                   
+            failed = False
             with no_db_warnings():
                 try:
                     cursor.execute(query,params)
                 except Exception:
                     # The following show_warnings() will
                     # reveal the error:
-                    pass
-            mysql_warnings = self.connection.show_warnings()
+                    failed = True
+            mysql_warnings = self._fetch_warnings(cursor, failed)
             if len(mysql_warnings) > 0:
-                warnings   = [warning_tuple for warning_tuple in mysql_warnings if warning_tuple[0] == 'Warning']
-                errors     = [error_tuple for error_tuple in mysql_warnings if error_tuple[0] == 'Error']
-                if len(warnings) == 0:
-                    warnings = None
-                if len(errors) == 0:
-                    errors = None
+                (errors, warnings) = self._split_warnings(mysql_warnings)
         finally:
-            self.connection.commit()                                                                                                                                                                          
-            cursor.close()
-            return (None,None) if len(mysql_warnings) == 0 else (errors, warnings)
+            self._commit()
+        return (None,None) if len(mysql_warnings) == 0 else (errors, warnings)
+
+    #-------------------------
+    # executemany
+    #--------------
+    
+    def executemany(self, query, paramsList):
+        '''
+        Executes a parameterized statement once for each
+        tuple of actuals in paramsList, as the cursor's
+        executemany() does. For a single INSERT or REPLACE 
+        of the form::
+        
+            INSERT INTO myTable (col1,col2) VALUES (%s,%s)
+            
+        the driver sends the rows as multi-row INSERT
+        statements, each up to half the server's 
+        max_allowed_packet, instead of one statement per row.
+        Other statements are executed once per tuple.
+        
+        @param   query: query with parameter placeholders
+        @type    query: string
+        @param   paramsList: one tuple of actuals for each execution
+        @type    paramsList: [(<any>)]
+        @return: (None,None) if all ok, else tuple: (errorList, warningsList)
+        @rtype: {(None,None) | ([str],[str])}  
+        '''
+
+        errors   = []
+        warnings = []
+        driver_error = None
+        mysql_warnings = []
+        cursor = self._write_cursor()
+        try:
+            # The driver splits the rows into INSERT statements
+            # of at most max_stmt_length bytes; its default is far
+            # below what the server accepts. Fewer, larger statements
+            # save round trips. Stay well below the packet limit.
+            # If the server can't tell us the limit, keep the
+            # driver's default; the (errors, warnings) result
+            # then reports any trouble with the statement itself:
+            try:
+                cursor.max_stmt_length = max(cursor.max_stmt_length,
+                                             self.server_vars()['max_allowed_packet'] // 2)
+            except Exception:
+                pass
+            with no_db_warnings():
+                try:
+                    cursor.executemany(query, paramsList)
+                except Exception as e:
+                    driver_error = e
+            mysql_warnings = self._fetch_warnings(cursor, driver_error is not None)
+            # Errors the driver detects before the statement 
+            # reaches the server, such as a mismatch between the
+            # number of columns and values, are not reported by 
+            # show_warnings(). Add them from the exception:
+            if driver_error is not None and \
+               not any(warning_tuple[0] == 'Error' for warning_tuple in mysql_warnings):
+                if len(driver_error.args) > 1:
+                    (err_code, err_msg) = driver_error.args[0], driver_error.args[1]
+                else:
+                    (err_code, err_msg) = 0, str(driver_error)
+                mysql_warnings = tuple(mysql_warnings) + (('Error', err_code, err_msg),)
+            if len(mysql_warnings) > 0:
+                (errors, warnings) = self._split_warnings(mysql_warnings)
+        finally:
+            self._commit()
+        return (None,None) if len(mysql_warnings) == 0 else (errors, warnings)
 
     # ----------------------- Utilities -------------------------                    
 
@@ -800,53 +1402,108 @@ class MySQLDB(object):
 
         # Delete the cursor's entry in the 
         # cursors { queryStr --> cursor } dict.
-        # Since there will be few entries, the
-        # following dictionary scan isn't a problem:
+        # The entry may meanwhile belong to a newer
+        # cursor for the same query string; leave 
+        # that one alone:
     
-        cursors_copy = self.cursors.copy()
-        for query_str, the_cursor in cursors_copy.items():
-            if the_cursor == cursor:
-                del self.cursors[query_str]
+        query_str = self._cursor_queries.pop(id(cursor), None)
+        if query_str is not None and self.cursors.get(query_str) is cursor:
+            del self.cursors[query_str]
         cursor.close()
     
     #-------------------------
-    # _ensureSQLTyping
+    # _write_cursor
     #--------------
     
-    def _ensureSQLTyping(self, colVals):
+    def _write_cursor(self):
+        '''
+        Return the cursor that insert(), update(), update_many(),
+        executeParameterized(), and executemany() share. Their
+        statements return no rows, so one cursor can serve them
+        all, saving a cursor creation and close per call. Like
+        the rest of MySQLDB, the cursor must not be used from 
+        multiple threads at once. query() and execute() use 
+        cursors of their own, because they may leave rows 
+        behind. Closed by close().
+        
+        @return: cursor on this instance's connection
+        @rtype: Cursor
         '''
-        Given a list of items, return a string that preserves
-        MySQL typing. Example: (10, 'My Poem') ---> '10, "My Poem"'
-        Note that ','.join(map(str,myList)) won't work:
-        (10, 'My Poem') ---> '10, My Poem'
+        if self._shared_cursor is None:
+            self._shared_cursor = self.connection.cursor()
+        return self._shared_cursor
 
-        @param colVals: list of column values destined for a MySQL table
-        @type colVals: <any>
-        @return: string of string-separated, properly typed column values
-        @rtype: string
+    #-------------------------
+    # _commit
+    #--------------
+    
+    def _commit(self):
+        '''
+        Commit the most recent statement, unless the server
+        already did so because the connection is in autocommit
+        mode, or unless a transaction() block is in progress.
+        Checking the autocommit mode does not involve the server.
         '''
+        if self.in_transaction or self.connection.get_autocommit():
+            return
+        self.connection.commit()
+
+    #-------------------------
+    # _fetch_warnings
+    #--------------
+    
+    def _fetch_warnings(self, cursor, failed):
+        '''
+        Return MySQL's warnings and errors for the statement
+        just executed on the given cursor, as show_warnings()
+        reports them. If the statement succeeded and the server
+        reported zero warnings, returns an empty tuple without 
+        the round trip to the server. After a failure the warning
+        count is not reliable, so show_warnings() is always called.
+        
+        @param cursor: cursor on which the statement was executed
+        @type cursor: Cursor
+        @param failed: whether executing the statement raised an exception
+        @type failed: bool
+        @return: tuple of (Level, Code, Message) tuples
+        @rtype: ((str,int,str))
+        '''
+        if not failed:
+            try:
+                # pymysql keeps the count on the cursor...
+                warning_count = cursor.warning_count
+            except AttributeError:
+                # ... mysqlclient on the connection:
+                warning_count = self.connection.warning_count()
+            if warning_count == 0:
+                return ()
+        return self.connection.show_warnings()
+
+    #-------------------------
+    # _split_warnings
+    #--------------
+
+    def _split_warnings(self, mysql_warnings):
+        '''
+        Sort show_warnings() tuples by level into errors
+        and warnings, in a single pass. Other levels, such
+        as 'Note', are dropped.
+        
+        @param mysql_warnings: (Level, Code, Message) tuples
+        @type mysql_warnings: ((str,int,str))
+        @return: tuple (errorList, warningsList); each is None if empty
+        @rtype: ({[(str,int,str)] | None}, {[(str,int,str)] | None})
+        '''
+        errors   = []
+        warnings = []
+        for warning_tuple in mysql_warnings:
+            level = warning_tuple[0]
+            if level == 'Warning':
+                warnings.append(warning_tuple)
+            elif level == 'Error':
+                errors.append(warning_tuple)
+        return (errors or None, warnings or None)
 
-        resList = []
-        for el in colVals:
-            if isinstance(el, basestring):
-                try:
-                    # If value is not already UTF-8, encode it:
-                    cleanStr = str(el, 'UTF-8', 'replace')
-                except TypeError:
-                    # Value was already in Unicode, so all is well:
-                    cleanStr = el
-                resList.append('"%s"' % cleanStr)
-            elif el is None:
-                resList.append('null')
-            elif isinstance(el, (list, dict, set)):
-                resList.append('"%s"' % str(el))
-            else: # e.g. numbers
-                resList.append(el)
-        try:
-            return ','.join(map(str,resList))
-        except UnicodeEncodeError as e:
-            print('Unicode related error: %s' % repr(e))
-            
     #-------------------------
     # convert_to_string
     #--------------
@@ -863,20 +1520,8 @@ class MySQLDB(object):
         @type strLike: {str|unicode|byte}
         '''
         
-        try:
-            if type(strLike) == eval('unicode'):
-                # Python 2.7 unicode --> str:
-                strLike = strLike.encode('UTF-8')
-        except NameError:
-            pass
-        
-        try:
-            if type(strLike) == eval('bytes'):
-                # Python 3 byte string:
-                strLike = strLike.decode('UTF-8')
-        except NameError:
-            pass
-        
+        if isinstance(strLike, _UNDECODED_STR_TYPES):
+            strLike = _to_native_str(strLike)
         return strLike
 
     
@@ -893,21 +1538,29 @@ class MySQLDB(object):
         None is *not* turned into a string. It will be turned
         into a NULL instead.
         
-        Acts as an iterator! Use like:
-        for element in _stringifyList(someList):
-            print(element)
+        Returns a list, which csv.writer can consume without
+        going through a generator.
 
         @param iterable: mixture of items of any type, including Unicode strings.
         @type iterable: [<any>]
+        @return: the stringified elements
+        @rtype: [str]
         '''
+        stringified = []
+        append = stringified.append
+        safeTypes = _STRINGIFY_SAFE_TYPES
         for element in iterable:
-            try:
-                if element is None:
-                    yield('NULL')
-                else:
-                    yield(str(element))
-            except UnicodeEncodeError:
-                yield element.encode('UTF-8','ignore')
+            if type(element) in safeTypes:
+                # Common case; str() cannot fail:
+                append(str(element))
+            elif element is None:
+                append('NULL')
+            else:
+                try:
+                    append(str(element))
+                except UnicodeEncodeError:
+                    append(element.encode('UTF-8','ignore'))
+        return stringified
     
     #-------------------------
     # find_mysql_path 
@@ -921,7 +1574,8 @@ class MySQLDB(object):
         we make sure the method works when running outside
         of Eclipse as well as in.
         
-        Stores path in MySQLDB.mysql_loc.
+        Stores path in MySQLDB.mysql_loc. Subsequent calls
+        return that cached path without searching again.
         
         @param cls: class instance of MySQLDB
         @type cls: MySQLDB
@@ -929,28 +1583,29 @@ class MySQLDB(object):
         @rtype: str
         '''
         
-        # The 'command -v mysql...' idiom always returns an empty
-        # string when probed from Eclipse. To facilitate debugging
-        # we find an alternative method for running in Eclipse.  
+        if cls.mysql_loc is not None:
+            return cls.mysql_loc
+        
+        import shutil
+        import socket
+        
+        # Searching the PATH always comes up empty when probed 
+        # from Eclipse. To facilitate debugging we find an 
+        # alternative method for running in Eclipse.  
         
         mysql_loc = None
         # Eclipse puts extra info into the env:
-        eclipse_indicator = os.getenv('XPC_SERVICE_NAME')
+        eclipse_indicator = os.getenv('XPC_SERVICE_NAME') or ''
         
         # If the indicator is absent, or it doesn't include
         # the eclipse info, then we are not in Eclipse; the usual
         # case, of course:
         
-        if eclipse_indicator is None or \
-           eclipse_indicator == '0' or \
-           eclipse_indicator.find('eclipse') == -1:
-            # Not running in Eclipse; use reliable method to find mysql:
-            mysql_loc = subprocess.check_output(
-                                        "command -v mysql; exit 0",
-                                        stderr=subprocess.STDOUT,
-                                        shell=True,
-                                        env=os.environ).strip()
-            if len(mysql_loc) == 0:  
+        if 'eclipse' not in eclipse_indicator:
+            # Not running in Eclipse; search the PATH, as 
+            # 'command -v mysql' would, but without spawning a shell:
+            mysql_loc = shutil.which('mysql')
+            if mysql_loc is None:  
                 raise RuntimeError("MySQL client not found on this machine (%s)" % socket.gethostname())
         else:
             # We are in Eclipse:
@@ -982,13 +1637,32 @@ class QueryResult(object):
     Instances of this class are returned by MySQLDB's 
     query() method. Use next() and nextall() to get
     one result at a time, or all at once.
+    
+    Rows are pulled from the cursor FETCH_BATCH_SIZE 
+    at a time, and handed out one by one from a local
+    buffer.
     '''
+    
+    # Number of rows to obtain from the cursor 
+    # with each fetchmany():
+    FETCH_BATCH_SIZE = 256
   
-    def __init__(self, cursor, query_str, cursor_owner_obj):
+    def __init__(self, cursor, query_str, cursor_owner_obj, chunksize=None):
         self.mysql_cursor = cursor
         self.cursor_owner = cursor_owner_obj
         self.the_query_str    = query_str
         self.exhausted    = False
+        # Rows fetched, but not yet returned, in 
+        # reverse order so that pop() yields the
+        # next row. The list object is reused for
+        # every batch:
+        self._row_buf     = []
+        # Bound once, rather than looked up on self
+        # and the cursor for every batch:
+        self._fetchmany   = cursor.fetchmany
+        if chunksize is not None:
+            # Override the class-level default:
+            self.FETCH_BATCH_SIZE = chunksize
       
     def __iter__(self):
         return self
@@ -1011,30 +1685,53 @@ class QueryResult(object):
         @raise StopIteration
         '''
   
-        res = self.mysql_cursor.fetchone()
-        if res is None:
-            self.cursor_owner.query_exhausted(self.mysql_cursor)
-            self.exhausted = True
-            raise StopIteration()            
+        row_buf = self._row_buf
+        if not row_buf:
+            rows = self._fetchmany(self.FETCH_BATCH_SIZE)
+            if not rows:
+                self.cursor_owner.query_exhausted(self.mysql_cursor)
+                self.exhausted = True
+                raise StopIteration()
+            row_buf.extend(reversed(rows))
+            
+        res = row_buf.pop()
+        if len(res) == 1 and (type(res) == list or type(res) == tuple):
+            return res[0]
         else:
-            if len(res) == 1 and (type(res) == list or type(res) == tuple):
-                return res[0]
-            else:
-                return res
+            return res
          
     __next__ = next
     
-    def nextall(self):
+    def nextall(self, unwrap=False):
         '''
         Returns the remaining query results as a 
         tuple of tuples.
         
+        With unwrap set to True, results of single-column
+        queries are instead returned as a flat tuple of the
+        column values, as next() does for individual rows: 
+        `(('foo',), ('bar',)) --> ('foo', 'bar')`. Rows that
+        are dicts are never unwrapped.
+        
+        @param unwrap: whether to flatten single-column results
+        @type unwrap: bool
         @return: all remaining tuples inside a wrapper tuple, or empty tuple
                  if no results remain.
         @rtype: ((str))
         
         '''
         all_remaining = self.mysql_cursor.fetchall()
+        if self._row_buf:
+            # Rows already fetched by next(), but
+            # not yet returned come first:
+            self._row_buf.reverse()
+            all_remaining = tuple(self._row_buf) + tuple(all_remaining)
+            del self._row_buf[:]
+        if unwrap and all_remaining and \
+           len(self.mysql_cursor.description) == 1 and \
+           type(all_remaining[0]) == tuple:
+            # Unwrap in one C-level loop:
+            all_remaining = tuple(map(itemgetter(0), all_remaining))
         # We exhausted the query, so clean up:
         self.cursor_owner.query_exhausted(self.mysql_cursor)
         self.exhausted = True
@@ -1061,26 +1758,29 @@ class QueryResult(object):
       
 # ----------------------- Context Managers -------------------------    
 
+# MySQL warnings and errors are reported to callers through
+# the (errors, warnings) return values, which come from 
+# show_warnings(). Python-level warnings that older versions
+# of the drivers issue for the same events are redundant.
+# 
 # Ability to write:
 #    with no_warn_no_table():
 #       ... DROP TABLE IF NOT EXISTS ...
 # without annoying Python-level warnings that the
-# table did not exist:
-
-@contextmanager
-def no_warn_no_table():
-    filterwarnings('ignore', message=r".*Unknown table.*", category=db_warning)
-    yield
-    resetwarnings()
-
-@contextmanager
-def no_warn_dup_key():
-    filterwarnings('ignore', message=r".*Duplicate entry.*", category=db_warning)
-    yield
-    resetwarnings()
-
-@contextmanager
-def no_db_warnings():
-    filterwarnings('ignore', category=db_warning)
-    yield
-    resetwarnings()
+# table did not exist. The filter is scoped to the
+# with-block, so the warning filters of the calling
+# application are left alone. All three names are the
+# same context manager:
+
+class _NoDbWarnings(object):
+    def __enter__(self):
+        self._catcher = catch_warnings()
+        self._catcher.__enter__()
+        simplefilter('ignore', db_warning)
+        return self
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._catcher.__exit__(exc_type, exc_value, traceback)
+
+no_warn_no_table = _NoDbWarnings
+no_warn_dup_key  = _NoDbWarnings
+no_db_warnings   = _NoDbWarnings
@@ -77,9 +77,12 @@ class MyTestRunner(unittest.TextTestRunner):
             # So remove the file we created:
             os.remove(config_file_name)
         else:
-            with open(config_file_name, 'w') as fd:
+            # Write a sibling file, and rename it over the 
+            # config file in one atomic step:
+            tmp_file_name = config_file_name + '.tmp'
+            with open(tmp_file_name, 'w') as fd:
                 fd.write(content)
-                fd.flush() 
+            os.replace(tmp_file_name, config_file_name)
 
     #-------------------------
     # create_configuration 
@@ -101,9 +104,10 @@ class MyTestRunner(unittest.TextTestRunner):
         config = "[substrate]\n" + "FORCE_PYTHON_NATIVE = False\n"
 
         config_file_name = self.get_config_file_name()
-        with open(config_file_name, 'w') as fd:
-            fd.write(config)
-            fd.flush()
+        # No need to write if the file already says just that:
+        if self.read_config_file_content() != config:
+            with open(config_file_name, 'w') as fd:
+                fd.write(config)
         
         self.config_parser = UtilsConfigParser([config_file_name])
 
@@ -125,12 +129,20 @@ class MyTestRunner(unittest.TextTestRunner):
         the FORCE_PYTHON_NATIVE config key, set that key
         in the existing UtilsConfigParser, which is expected
         in self.config_parser. The new configuration is written
-        to pymysql_utils.cnf.
+        to pymysql_utils.cnf, unless the key already has the 
+        requested value.
+        
+        The file cannot be skipped altogether: pymysql_utils
+        re-reads it when first imported, and chooses its 
+        substrate from the file's content.
         
         @param force_python_native: whether or not to use pymysql substrate
         @type force_python_native: bool
         '''
-        self.config_parser['substrate']['FORCE_PYTHON_NATIVE'] = str(force_python_native)
+        substrate = self.config_parser['substrate']
+        if substrate.getboolean('FORCE_PYTHON_NATIVE', fallback=None) == force_python_native:
+            return
+        substrate['FORCE_PYTHON_NATIVE'] = str(force_python_native)
         self.config_parser.write()
 
     #-------------------------
@@ -183,8 +195,10 @@ class MyTestRunner(unittest.TextTestRunner):
             _result2 = super().run(self.get_test_suite())
             print("****** Done testing over pymysql (Python-only mysql client) substrate.")        
         finally:
-            # Restore original configuration:
-            print("****** Restoring original pymysql_utils.cnf...")
-            self.write_config_file_content(config_file_orig)
-            print("****** Done restoring original pymysql_utils.cnf.")
+            # Restore original configuration, unless
+            # the file still holds it:
+            if self.read_config_file_content() != config_file_orig:
+                print("****** Restoring original pymysql_utils.cnf...")
+                self.write_config_file_content(config_file_orig)
+                print("****** Done restoring original pymysql_utils.cnf.")
         return result1
@@ -25,10 +25,9 @@ TEST_ALL = True
 #TEST_ALL = False
 
 
-from collections import OrderedDict
+import json
 import re
 import socket
-import subprocess
 import unittest
 import os
 
@@ -40,11 +39,24 @@ else:
     # Running in Eclipse:
     from pymysql_utils import MySQLDB, DupKeyAction, no_warn_no_table, Cursors
 
+# Name of this machine, for comparing with MySQL's @@hostname:
+_HOSTNAME = socket.gethostname()
+
+# Returns a row if table myTbl exists in db unittest:
+_TBL_EXISTS_QUERY = "SELECT table_name FROM information_schema.tables WHERE table_schema = 'unittest' AND table_name = 'myTbl'"
+
 class TestPymysqlUtils(unittest.TestCase):
     '''
     Tests pymysql_utils.    
     '''
 
+    # (major, minor) of the server; see get_mysql_version():
+    mysql_version = None
+    # Connection used by all tests; opened in setUp():
+    shared_mysqldb = None
+    # Connection with dict cursor; see get_dict_mysqldb():
+    shared_dict_mysqldb = None
+
     @classmethod
     def setUpClass(cls):
         # Ensure that a user unittest with the proper
@@ -103,11 +115,17 @@ class TestPymysqlUtils(unittest.TestCase):
                ''' % 'GRANT %s ON unittest.* TO unittest@localhost;' % ','.join(needed_grants)
             TestPymysqlUtils.env_ok = False
 
+        if not TestPymysqlUtils.env_ok:
+            # setUp() will report the problem:
+            return
+
         # Check MySQL version:
         try:
-            (major, minor) = TestPymysqlUtils.get_mysql_version()
+            (major, minor) = TestPymysqlUtils.get_mysql_version(mysqldb)
         except Exception as e:
             raise OSError('Could not get mysql version number: %s' % str(e))
+        finally:
+            mysqldb.close()
             
         if major is None:
             print('Warning: MySQL version number not found; testing as if V5.7')
@@ -123,13 +141,35 @@ class TestPymysqlUtils(unittest.TestCase):
                 TestPymysqlUtils.minor = 7
         
 
+    @classmethod
+    def tearDownClass(cls):
+        if cls.shared_mysqldb is not None:
+            cls.shared_mysqldb.close()
+            cls.shared_mysqldb = None
+        if cls.shared_dict_mysqldb is not None:
+            cls.shared_dict_mysqldb.close()
+            cls.shared_dict_mysqldb = None
+
     def setUp(self):
         if not TestPymysqlUtils.env_ok:
             raise RuntimeError(TestPymysqlUtils.err_msg)
-        try:
-            self.mysqldb = MySQLDB(host='localhost', port=3306, user='unittest', db='unittest')
-        except ValueError as e:
-            self.fail(str(e) + " (For unit testing, localhost MySQL server must have user 'unittest' without password, and a database called 'unittest')")
+        # All tests share one connection, which is only
+        # reopened after a test closed it:
+        if TestPymysqlUtils.shared_mysqldb is None or \
+            not TestPymysqlUtils.shared_mysqldb.isOpen():
+            try:
+                TestPymysqlUtils.shared_mysqldb = MySQLDB(host='localhost', port=3306, user='unittest', db='unittest')
+            except ValueError as e:
+                self.fail(str(e) + " (For unit testing, localhost MySQL server must have user 'unittest' without password, and a database called 'unittest')")
+        self.mysqldb = TestPymysqlUtils.shared_mysqldb
+        # Raw cursor on the shared connection, for checking
+        # results independently of pymysql_utils; reused by 
+        # all of a test's checks. Tests that need a cursor on
+        # another connection open and close their own:
+        self.shared_cursor = self.mysqldb.connection.cursor()
+        # Tables the test created, and tearDown() drops;
+        # see create_table() and buildSmallDb():
+        self.tables_used = set()
             
         # Make MySQL version more convenient to check:
         if (TestPymysqlUtils.major == 5 and TestPymysqlUtils.minor >= 7) or \
@@ -140,12 +180,15 @@ class TestPymysqlUtils(unittest.TestCase):
 
 
     def tearDown(self):
+        if TestPymysqlUtils.shared_mysqldb.isOpen():
+            self.shared_cursor.close()
         if self.mysqldb.isOpen():
-            self.mysqldb.dropTable('unittest')
-            # Make sure the test didn't set a password
-            # for user unittest in the db:
-            self.mysqldb.execute("SET PASSWORD FOR unittest@localhost = '';")
-            self.mysqldb.close()
+            for tbl_name in self.tables_used:
+                self.mysqldb.dropTable(tbl_name)
+            # Close connections that the test opened
+            # itself, but keep the shared one:
+            if self.mysqldb is not TestPymysqlUtils.shared_mysqldb:
+                self.mysqldb.close()
 
     # ----------------------- Table Manilupation -------------------------
 
@@ -184,16 +227,8 @@ class TestPymysqlUtils(unittest.TestCase):
         # the pymysql_utils query() method:
         
         self.mysqldb.dropTable('myTbl')
-        cursor = self.mysqldb.connection.cursor()
-        tbl_exists_query = '''
-                  SELECT table_name 
-                    FROM information_schema.tables 
-                   WHERE table_schema = 'unittest' 
-                     AND table_name = 'myTbl';
-                     '''
-        cursor.execute(tbl_exists_query)
-        self.assertEqual(cursor.rowcount, 0)
-        cursor.close()
+        self.shared_cursor.execute(_TBL_EXISTS_QUERY)
+        self.assertEqual(self.shared_cursor.rowcount, 0)
 
     #-------------------------
     # Creating Temporary Tables 
@@ -253,15 +288,11 @@ class TestPymysqlUtils(unittest.TestCase):
       
         # Initial test db with known num of rows:
         rows_in_test_db = self.buildSmallDb()
-        cursor = self.mysqldb.connection.cursor()
-        cursor.execute('SELECT * FROM unittest;')
-        self.assertEqual(cursor.rowcount, rows_in_test_db)
+        self.assertEqual(self.fetch_one('SELECT COUNT(*) FROM unittest'), rows_in_test_db)
         
         self.mysqldb.truncateTable('unittest')
         
-        cursor.execute('SELECT * FROM unittest;')
-        self.assertEqual(cursor.rowcount, 0)
-        cursor.close()
+        self.assertEqual(self.fetch_one('SELECT COUNT(*) FROM unittest'), 0)
 
     # ----------------------- Insertion and Update -------------------------
     
@@ -271,26 +302,24 @@ class TestPymysqlUtils(unittest.TestCase):
     
     @unittest.skipIf(not TEST_ALL, "Temporarily disabled")    
     def testInsert(self):
-        schema = OrderedDict([('col1', 'INT'), ('col2', 'TEXT')])
-        self.mysqldb.createTable('unittest', schema)
-        colnameValueDict = OrderedDict([('col1', 10)])
+        schema = {'col1' : 'INT', 'col2' : 'TEXT'}
+        self.create_table('unittest', schema)
+        colnameValueDict = {'col1' : 10}
         self.mysqldb.insert('unittest', colnameValueDict)
-        self.assertEqual((10, None), self.mysqldb.query("SELECT * FROM unittest").next())
+        self.assertEqual((10, None), self.fetch_one("SELECT * FROM unittest"))
         # for value in self.mysqldb.query("SELECT * FROM unittest"):
         #    print value
         
         # Insert row with an explicit None:
-        colnameValueDict = OrderedDict([('col1', None)])
+        colnameValueDict = {'col1' : None}
         self.mysqldb.insert('unittest', colnameValueDict)
         
-        cursor = self.mysqldb.connection.cursor()
-        cursor.execute('SELECT col1 FROM unittest')
+        self.shared_cursor.execute('SELECT col1 FROM unittest')
         # Swallow the first row: 10, Null:
-        cursor.fetchone()
+        self.shared_cursor.fetchone()
         # Get col1 of the row we added (the 2nd row):
-        val = cursor.fetchone()
+        val = self.shared_cursor.fetchone()
         self.assertEqual(val, (None,))
-        cursor.close()
  
     #-------------------------
     # Insert One Row With Error 
@@ -298,13 +327,13 @@ class TestPymysqlUtils(unittest.TestCase):
     
     @unittest.skipIf(not TEST_ALL, "Temporarily disabled")    
     def testInsertWithError(self):
-        schema = OrderedDict([('col1', 'INT'), ('col2', 'TEXT')])
-        self.mysqldb.createTable('unittest', schema)
-        colnameValueDict = OrderedDict([('col1', 10)])
+        schema = {'col1' : 'INT', 'col2' : 'TEXT'}
+        self.create_table('unittest', schema)
+        colnameValueDict = {'col1' : 10}
         (errors,warnings) = self.mysqldb.insert('unittest', colnameValueDict)
         self.assertIsNone(errors)
         self.assertIsNone(warnings)
-        self.assertEqual((10, None), self.mysqldb.query("SELECT * FROM unittest").next())
+        self.assertEqual((10, None), self.fetch_one("SELECT * FROM unittest"))
         # for value in self.mysqldb.query("SELECT * FROM unittest"):
         #    print value
 
@@ -315,13 +344,26 @@ class TestPymysqlUtils(unittest.TestCase):
 
     @unittest.skipIf(not TEST_ALL, "Temporarily disabled")    
     def testInsertSeveralColumns(self):
-        schema = OrderedDict([('col1', 'INT'), ('col2', 'TEXT')])
-        self.mysqldb.createTable('unittest', schema)
-        colnameValueDict = OrderedDict([('col1', 10), ('col2', 'My Poem')])
+        schema = {'col1' : 'INT', 'col2' : 'TEXT'}
+        self.create_table('unittest', schema)
+        colnameValueDict = {'col1' : 10, 'col2' : 'My Poem'}
         self.mysqldb.insert('unittest', colnameValueDict)
-        res = self.mysqldb.query("SELECT * FROM unittest").next()
+        res = self.fetch_one("SELECT * FROM unittest")
         self.assertEqual((10, 'My Poem'), res)
-    
+
+        # Values are passed as parameters, so quotes
+        # need no escaping by the caller:
+        colnameValueDict = {'col1' : 20, 'col2' : 'She said "Don\'t"'}
+        self.mysqldb.insert('unittest', colnameValueDict)
+        res = self.fetch_one("SELECT col2 FROM unittest WHERE col1 = 20")
+        self.assertEqual('She said "Don\'t"', res)
+
+        # Containers are stored as JSON:
+        colnameValueDict = {'col1' : 30, 'col2' : {'poem' : ['My', "Don't", 1]}}
+        self.mysqldb.insert('unittest', colnameValueDict)
+        res = self.fetch_one("SELECT col2 FROM unittest WHERE col1 = 30")
+        self.assertEqual(json.loads(res), {'poem' : ['My', "Don't", 1]})
+
 
     #-------------------------
     # Bulk Insertion 
@@ -358,13 +400,13 @@ class TestPymysqlUtils(unittest.TestCase):
             self.assertIsNone(warnings)
             
         # First tuple should still be (10, 'col1'):
-        self.assertEqual('col1', self.mysqldb.query('SELECT col2 FROM unittest WHERE col1 = 10').next())
+        self.assertEqual('col1', self.fetch_one('SELECT col2 FROM unittest WHERE col1 = 10'))
         
         # Try update again, but with replacement:
         (errors, warnings) = self.mysqldb.bulkInsert('unittest', colNames, colValues, onDupKey=DupKeyAction.REPLACE) #@UnusedVariable
         self.assertIsNone(warnings)
         # Now row should have changed:
-        self.assertEqual('newCol1', self.mysqldb.query('SELECT col2 FROM unittest WHERE col1 = 10').next())
+        self.assertEqual('newCol1', self.fetch_one('SELECT col2 FROM unittest WHERE col1 = 10'))
         
         # Insert a row with duplicate key, specifying IGNORE:
         colNames = ['col1', 'col2']
@@ -378,56 +420,98 @@ class TestPymysqlUtils(unittest.TestCase):
         else:
             self.assertIsNone(warnings)
         
-        self.assertEqual('newCol1', self.mysqldb.query('SELECT col2 FROM unittest WHERE col1 = 10').next())
+        self.assertEqual('newCol1', self.fetch_one('SELECT col2 FROM unittest WHERE col1 = 10'))
         
         # Insertions that include NULL values:
         colValues = [(40, None), (50, None)]
         (errors, warnings) = self.mysqldb.bulkInsert('unittest', colNames, colValues) #@UnusedVariable
-        self.assertEqual(None, self.mysqldb.query('SELECT col2 FROM unittest WHERE col1 = 40').next())
-        self.assertEqual(None, self.mysqldb.query('SELECT col2 FROM unittest WHERE col1 = 50').next())
+        self.assertEqual(None, self.fetch_one('SELECT col2 FROM unittest WHERE col1 = 40'))
+        self.assertEqual(None, self.fetch_one('SELECT col2 FROM unittest WHERE col1 = 50'))
         
         # Provoke an error:
         colNames = ['col1', 'col2', 'col3']
         colValues = [(10, 'newCol2')]
         (errors, warnings) = self.mysqldb.bulkInsert('unittest', colNames, colValues, onDupKey=DupKeyAction.IGNORE) #@UnusedVariable
         self.assertEqual(len(errors), 1)
-        
+
+        # Empty input is a no-op:
+        self.assertEqual(self.mysqldb.bulkInsert('unittest', colNames, []), (None,None))
+        self.assertEqual(self.mysqldb.insert('unittest', {}), (None,None))
+
+    #-------------------------
+    # Bulk Insertion Above Threshold
+    #--------------
+
+    @unittest.skipIf(not TEST_ALL, "Temporarily disabled")
+    def testBulkInsertLargeBatch(self):
+        # Batches at or above BULK_INSERT_THRESHOLD go
+        # through LOAD DATA LOCAL INFILE rather than executemany():
+        self.buildSmallDb()
+        self.mysqldb.execute('ALTER TABLE unittest ADD PRIMARY KEY(col1)')
+        colNames = ['col1', 'col2']
+        num_rows = MySQLDB.BULK_INSERT_THRESHOLD
+        colValues = [(100 + i, 'row%s' % i) for i in range(num_rows - 1)]
+        # One duplicate key with a NULL, and one non-ASCII value:
+        colValues.append((10, None))
+        colValues[0] = (100, u'Ünïcødé')
+
+        (errors, warnings) = self.mysqldb.bulkInsert('unittest', colNames, colValues)
+        self.assertIsNone(errors)
+        if self.mysql_ge_5_7:
+            self.assertEqual(len(warnings), 1)
+        else:
+            self.assertIsNone(warnings)
+        self.assertEqual(self.fetch_one('SELECT COUNT(*) FROM unittest'), 3 + num_rows - 1)
+        self.assertEqual('row5', self.fetch_one('SELECT col2 FROM unittest WHERE col1 = 105'))
+        self.assertEqual(u'Ünïcødé', self.fetch_one('SELECT col2 FROM unittest WHERE col1 = 100'))
+        self.assertEqual('col1', self.fetch_one('SELECT col2 FROM unittest WHERE col1 = 10'))
+
+        # A value that cannot be written as CSV aborts the
+        # load, and none of the batch's rows are kept:
+        class Unprintable(object):
+            def __str__(self):
+                raise ValueError('Cannot print')
+        badValues = [(5000 + i, 'bad%s' % i) for i in range(num_rows - 1)]
+        badValues.append((9999, Unprintable()))
+        with self.assertRaises(ValueError):
+            self.mysqldb.bulkInsert('unittest', colNames, badValues)
+        self.assertEqual(self.fetch_one('SELECT COUNT(*) FROM unittest'), 3 + num_rows - 1)
+
     #-------------------------
-    # Updates 
+    # Updates
     #--------------
 
     @unittest.skipIf(not TEST_ALL, "Temporarily disabled")    
     def testUpdate(self):
       
         num_rows = self.buildSmallDb()
-        cursor = self.mysqldb.connection.cursor()
         
         # Initially, col2 of row0 must be 'col1':
-        cursor.execute('SELECT col2 FROM unittest WHERE col1 = 10')
-        col2_row_zero = cursor.fetchone()
+        self.shared_cursor.execute('SELECT col2 FROM unittest WHERE col1 = 10')
+        col2_row_zero = self.shared_cursor.fetchone()
         self.assertTupleEqual(col2_row_zero, ('col1',))
         
         self.mysqldb.update('unittest', 'col1', 40, fromCondition='col1 = 10')
         
         # Now no col1 with value 10 should exist:
-        cursor.execute('SELECT col2 FROM unittest WHERE col1 = 10')
-        self.assertEqual(cursor.rowcount, 0)
+        self.shared_cursor.execute('SELECT col2 FROM unittest WHERE col1 = 10')
+        self.assertEqual(self.shared_cursor.rowcount, 0)
         # But a row with col1 == 40 should have col2 == 'col1':
-        cursor.execute('SELECT col2 FROM unittest WHERE col1 = 40')
-        col2_res = cursor.fetchone()
+        self.shared_cursor.execute('SELECT col2 FROM unittest WHERE col1 = 40')
+        col2_res = self.shared_cursor.fetchone()
         self.assertTupleEqual(col2_res, ('col1',))
         
         # Update *all* rows in one column:
         self.mysqldb.update('unittest', 'col1', 0)
-        cursor.execute('SELECT count(*) FROM unittest WHERE col1 = 0')
-        res_count = cursor.fetchone()
+        self.shared_cursor.execute('SELECT count(*) FROM unittest WHERE col1 = 0')
+        res_count = self.shared_cursor.fetchone()
         self.assertTupleEqual(res_count, (num_rows,))
         
         # Update with a MySQL NULL value by using Python None
         # for input and output:
         self.mysqldb.update('unittest', 'col1', None)
-        cursor.execute('SELECT count(*) FROM unittest WHERE col1 is %s', (None,))
-        res_count = cursor.fetchone()
+        self.shared_cursor.execute('SELECT count(*) FROM unittest WHERE col1 is %s', (None,))
+        res_count = self.shared_cursor.fetchone()
         self.assertTupleEqual(res_count, (num_rows,))
         
         # Update with a MySQL NULL value by using Python None
@@ -437,16 +521,77 @@ class TestPymysqlUtils(unittest.TestCase):
         num_rows = self.buildSmallDb()
 
         self.mysqldb.update('unittest', 'col1', None, "col2 = 'col2'")
-        cursor.execute('SELECT count(*) FROM unittest WHERE col1 is %s', (None,))
-        res_count = cursor.fetchone()
+        self.shared_cursor.execute('SELECT count(*) FROM unittest WHERE col1 is %s', (None,))
+        res_count = self.shared_cursor.fetchone()
         self.assertTupleEqual(res_count, (1,))
-                        
+
+        # Quotes in the new value, and a percent sign
+        # in the condition:
+        self.mysqldb.update('unittest', 'col2', 'It\'s "new"', "col2 LIKE 'col3%'")
+        self.shared_cursor.execute('SELECT col2 FROM unittest WHERE col1 = 30')
+        self.assertTupleEqual(self.shared_cursor.fetchone(), ('It\'s "new"',))
+
         # Provoke an error:
         (errors,warnings) = self.mysqldb.update('unittest', 'col6', 40, fromCondition='col1 = 10') #@UnusedVariable
         self.assertEqual(len(errors), 1)
-        
-        cursor.close()
     
+    #-------------------------
+    # Updates Of Many Rows
+    #--------------
+
+    @unittest.skipIf(not TEST_ALL, "Temporarily disabled")
+    def testUpdateMany(self):
+        self.buildSmallDb()
+        (errors, warnings) = self.mysqldb.update_many('unittest', 'col1', 'col2',
+                                                      [(10, 'new10'), (30, None), (99, 'noSuchRow')])
+        self.assertIsNone(errors)
+        self.assertIsNone(warnings)
+        self.assertEqual(list(self.mysqldb.query('SELECT col1,col2 FROM unittest ORDER BY col1')),
+                         [(10, 'new10'), (20, 'col2'), (30, None)])
+
+        # Empty list of updates is a no-op:
+        self.assertEqual(self.mysqldb.update_many('unittest', 'col1', 'col2', []), (None,None))
+
+        # Provoke an error:
+        (errors, warnings) = self.mysqldb.update_many('unittest', 'col1', 'col6', [(10, 'foo')]) #@UnusedVariable
+        self.assertEqual(len(errors), 1)
+
+    #-------------------------
+    # Transactions
+    #--------------
+
+    @unittest.skipIf(not TEST_ALL, "Temporarily disabled")
+    def testTransaction(self):
+        self.buildSmallDb()
+        # Autocommit mode is the default:
+        self.assertTrue(self.mysqldb.connection.get_autocommit())
+
+        with self.mysqldb.transaction():
+            self.mysqldb.update('unittest', 'col2', 'txn', fromCondition='col1 = 10')
+            self.mysqldb.insert('unittest', {'col1' : 40, 'col2' : 'col4'})
+        self.assertEqual(self.fetch_one('SELECT COUNT(*) FROM unittest'), 4)
+
+        # An exception inside the block rolls back all its statements:
+        with self.assertRaises(RuntimeError):
+            with self.mysqldb.transaction():
+                self.mysqldb.insert('unittest', {'col1' : 50, 'col2' : 'col5'})
+                self.mysqldb.update('unittest', 'col2', 'rolledBack', fromCondition='col1 = 20')
+                raise RuntimeError('Abort the transaction')
+        self.assertEqual(self.fetch_one('SELECT COUNT(*) FROM unittest'), 4)
+        self.assertEqual(self.fetch_one('SELECT col2 FROM unittest WHERE col1 = 20'), 'col2')
+
+        # Without autocommit, methods still commit each statement.
+        # Use a connection of the test's own, leaving the shared one
+        # as it is:
+        self.mysqldb = MySQLDB(host='localhost', user='unittest', db='unittest', autocommit=False)
+        self.assertFalse(self.mysqldb.connection.get_autocommit())
+        self.mysqldb.insert('unittest', {'col1' : 60, 'col2' : 'col6'})
+        other_db = MySQLDB(host='localhost', user='unittest', db='unittest')
+        try:
+            self.assertEqual(other_db.query('SELECT col2 FROM unittest WHERE col1 = 60').next(), 'col6')
+        finally:
+            other_db.close()
+
     # ----------------------- Queries -------------------------         
 
     #-------------------------
@@ -457,34 +602,67 @@ class TestPymysqlUtils(unittest.TestCase):
     def testQueryIterator(self):
         self.buildSmallDb()
 
-        for rowNum, result in enumerate(self.mysqldb.query('SELECT col1,col2 FROM unittest')):
-            if rowNum == 0:
-                self.assertEqual((10, 'col1'), result)
-            elif rowNum == 1:
-                self.assertEqual((20, 'col2'), result)
-            elif rowNum == 2:
-                self.assertEqual((30, 'col3'), result)
+        self.assertEqual(list(self.mysqldb.query('SELECT col1,col2 FROM unittest ORDER BY col1')),
+                         [(10, 'col1'), (20, 'col2'), (30, 'col3')])
+
+        # Single-column results, flattened on request:
+        res_it = self.mysqldb.query('SELECT col1 FROM unittest ORDER BY col1')
+        self.assertEqual(res_it.next(), 10)
+        self.assertEqual(res_it.nextall(unwrap=True), (20, 30))
+
+        # Server-side cursor connections pull rows from the
+        # server as the iterator advances, rather than loading
+        # the whole result first. A small chunksize makes a
+        # handful of rows span several fetches, including a
+        # partial last one:
+        num_rows = 10
+        self.mysqldb.bulkInsert('unittest', ['col1', 'col2'],
+                                [(100 + i, 'row%s' % i) for i in range(num_rows)])
+        ss_mysqldb = MySQLDB(host='localhost',
+                             user='unittest',
+                             db='unittest',
+                             cursor_class=Cursors.SS_CURSOR)
+        try:
+            rowNum = -1
+            for rowNum, result in enumerate(ss_mysqldb.query('SELECT col1 FROM unittest WHERE col1 >= 100 ORDER BY col1',
+                                                             chunksize=3)):
+                self.assertEqual(100 + rowNum, result)
+            self.assertEqual(rowNum, num_rows - 1)
+        finally:
+            ss_mysqldb.close()
 
         # Test the dict cursor
-        self.mysqldb.close()
-        self.mysqldb = MySQLDB(host='localhost',
-                               user='unittest',
-                               db='unittest',
-                               cursor_class=Cursors.DICT)
-        
-        for result in self.mysqldb.query('SELECT col1,col2 FROM unittest'):
-          
-            self.assertIsInstance(result, dict)
-            
-            if result['col1'] == 10:
-                self.assertEqual(result['col2'], 'col1')
-            elif result['col1'] == 20:
-                self.assertEqual(result['col2'], 'col2')
-            elif result['col1'] == 30:
-                self.assertEqual(result['col2'], 'col3')
+        dict_mysqldb = self.get_dict_mysqldb()
+        self.assertEqual(list(dict_mysqldb.query('SELECT col1,col2 FROM unittest WHERE col1 < 100 ORDER BY col1')),
+                         [{'col1' : 10, 'col2' : 'col1'},
+                          {'col1' : 20, 'col2' : 'col2'},
+                          {'col1' : 30, 'col2' : 'col3'}])
+
+    #-------------------------
+    # Streaming Query
+    #--------------
+
+    @unittest.skipIf(not TEST_ALL, "Temporarily disabled")
+    def testQueryStreaming(self):
+        self.buildSmallDb()
+
+        res_it = self.mysqldb.query('SELECT col1,col2 FROM unittest ORDER BY col1', stream=True)
+        self.assertEqual(list(res_it), [(10, 'col1'), (20, 'col2'), (30, 'col3')])
+
+        # Chunks smaller than the result deliver the same rows:
+        res_it = self.mysqldb.query('SELECT col1 FROM unittest ORDER BY col1', stream=True, chunksize=2)
+        self.assertEqual(list(res_it), [10, 20, 30])
+
+        # Once exhausted, the connection is free for the next query:
+        self.assertEqual(self.mysqldb.query('SELECT COUNT(*) FROM unittest').next(), 3)
+
+        # Dict cursor connections stream dicts:
+        res_it = self.get_dict_mysqldb().query('SELECT col1,col2 FROM unittest ORDER BY col1', stream=True)
+        self.assertEqual(res_it.next(), {'col1' : 10, 'col2' : 'col1'})
+        self.assertEqual(len(res_it.nextall()), 2)
 
     #-------------------------
-    # Query Unparameterized 
+    # Query Unparameterized
     #--------------
     
     @unittest.skipIf(not TEST_ALL, "Temporarily disabled")    
@@ -509,16 +687,51 @@ class TestPymysqlUtils(unittest.TestCase):
         # Provoke an error:
         (errors,warnings) = self.mysqldb.executeParameterized("UPDATE unittest SET col10=%s", (myVal,)) #@UnusedVariable
         self.assertEqual(len(errors), 1)
-        
+
+    #-------------------------
+    # Execute Many
+    #--------------
+
+    @unittest.skipIf(not TEST_ALL, "Temporarily disabled")
+    def testExecuteMany(self):
+        self.buildSmallDb()
+        (errors,warnings) = self.mysqldb.executemany("INSERT INTO unittest (col1,col2) VALUES (%s,%s)",
+                                                     [(40, 'col4'), (50, 'col5')])
+        self.assertIsNone(errors)
+        self.assertIsNone(warnings)
+        self.assertEqual(self.fetch_one('SELECT COUNT(*) FROM unittest'), 5)
+
+        # Statements other than INSERT run once per tuple:
+        self.mysqldb.executemany("UPDATE unittest SET col2=%s WHERE col1=%s",
+                                 [('new4', 40), ('new5', 50)])
+        res = self.mysqldb.query('SELECT col2 FROM unittest WHERE col1 >= 40 ORDER BY col1').nextall()
+        self.assertEqual(res, (('new4',), ('new5',)))
+
+        # Provoke an error:
+        (errors,warnings) = self.mysqldb.executemany("INSERT INTO unittest (col10) VALUES (%s)", [(1,)]) #@UnusedVariable
+        self.assertEqual(len(errors), 1)
+
     #-------------------------
     # Reading System Variables 
     #--------------
 
     @unittest.skipIf(not TEST_ALL, "Temporarily disabled")    
     def testReadSysVariable(self):
-        this_host = socket.gethostname()
-        mysql_hostname = self.mysqldb.query('SELECT @@hostname').next()
-        self.assertIn(mysql_hostname, [this_host, 'localhost'])
+        mysql_hostname = self.fetch_one('SELECT @@hostname')
+        self.assertIn(mysql_hostname, [_HOSTNAME, 'localhost'])
+
+    #-------------------------
+    # Server Variables Cache
+    #--------------
+
+    @unittest.skipIf(not TEST_ALL, "Temporarily disabled")
+    def testServerVars(self):
+        server_vars = self.mysqldb.server_vars()
+        max_packet = self.fetch_one('SELECT @@max_allowed_packet')
+        self.assertEqual(server_vars['max_allowed_packet'], max_packet)
+        self.assertIn('local_infile', server_vars)
+        # Later calls return the cached dict:
+        self.assertIs(self.mysqldb.server_vars(), server_vars)
 
     #-------------------------
     # User-Level Variables 
@@ -527,12 +740,12 @@ class TestPymysqlUtils(unittest.TestCase):
     @unittest.skipIf(not TEST_ALL, "Temporarily disabled")    
     def testUserVariables(self):
 
-        pre_foo = self.mysqldb.query("SELECT @foo").next()
+        pre_foo = self.fetch_one("SELECT @foo")
         self.assertEqual(pre_foo, None)
         
         self.mysqldb.execute("SET @foo = 'new value';")
         
-        post_foo = self.mysqldb.query("SELECT @foo").next()
+        post_foo = self.fetch_one("SELECT @foo")
         self.assertEqual(post_foo, 'new value')
         
         self.mysqldb.execute("SET @foo = 'NULL';")
@@ -549,35 +762,31 @@ class TestPymysqlUtils(unittest.TestCase):
     @unittest.skipIf(not TEST_ALL, "Temporarily disabled")    
     def testWithMySQLPassword(self):
         
-        try:
-            # Set a password for the unittest user:
-            if self.mysql_ge_5_7:
-                self.mysqldb.execute("SET PASSWORD FOR unittest@localhost = 'foobar'")
-            else:
-                self.mysqldb.execute("SET PASSWORD FOR unittest@localhost = PASSWORD('foobar')")
+        # Set a password for the unittest user:
+        if self.mysql_ge_5_7:
+            self.mysqldb.execute("SET PASSWORD FOR unittest@localhost = 'foobar'")
+        else:
+            self.mysqldb.execute("SET PASSWORD FOR unittest@localhost = PASSWORD('foobar')")
+        # Make sure to remove the pwd from user unittest,
+        # so that other tests will run successfully:
+        self.addCleanup(self.clear_password)
 
-            self.mysqldb.close()
-            
-            # We should be unable to log in without a pwd:
-            with self.assertRaises(ValueError):
-                self.mysqldb = MySQLDB(host='localhost', user='unittest', db='unittest')
-                
-            # Open new pymysql_db.MySQLDb instance, supplying pwd: 
-            self.mysqldb = MySQLDB(host='localhost', user='unittest', passwd='foobar', db='unittest')
-            # Do a test query:
-            self.buildSmallDb()
-            res = self.mysqldb.query("SELECT col2 FROM unittest WHERE col1 = 10;").next()
-            self.assertEqual(res, 'col1')
+        # Log in anew with connections of the test's own. The shared
+        # connection stays open, and usable by later tests:
+        
+        # We should be unable to log in without a pwd:
+        with self.assertRaises(ValueError):
+            self.mysqldb = MySQLDB(host='localhost', user='unittest', db='unittest')
             
-            # Bulk insert is also different for pwd vs. none:
-            self.testBulkInsert()
-        finally:
-            # Make sure the remove the pwd from user unittest,
-            # so that other tests will run successfully:
-            if self.mysql_ge_5_7:
-                self.mysqldb.execute("SET PASSWORD FOR unittest@localhost = ''")
-            else:
-                self.mysqldb.execute("SET PASSWORD FOR unittest@localhost = PASSWORD('')")
+        # Open new pymysql_db.MySQLDb instance, supplying pwd: 
+        self.mysqldb = MySQLDB(host='localhost', user='unittest', passwd='foobar', db='unittest')
+        # Do a test query:
+        self.buildSmallDb()
+        res = self.mysqldb.query("SELECT col2 FROM unittest WHERE col1 = 10;").next()
+        self.assertEqual(res, 'col1')
+        
+        # Bulk insert is also different for pwd vs. none:
+        self.testBulkInsert()
             
     #-------------------------
     # testResultCount 
@@ -713,6 +922,40 @@ class TestPymysqlUtils(unittest.TestCase):
         self.mysqldb.close()
         self.assertFalse(self.mysqldb.isOpen())
 
+    #-------------------------
+    # testPooledConnections
+    #--------------
+
+    @unittest.skipIf(not TEST_ALL, "Temporarily disabled")
+    def testPooledConnections(self):
+        self.assertTrue(self.mysqldb.ping())
+        # Non-pooled instances are closed at the end of a with-statement:
+        with MySQLDB(host='localhost', user='unittest', db='unittest') as mysqldb:
+            self.assertEqual(mysqldb.query('SELECT 1').next(), 1)
+        self.assertFalse(mysqldb.isOpen())
+
+        pooled1 = MySQLDB.get_pooled(host='localhost', user='unittest', db='unittest')
+        try:
+            with pooled1:
+                self.assertEqual(pooled1.query('SELECT 1').next(), 1)
+            # Pooled instances stay open, and are handed out again:
+            self.assertTrue(pooled1.isOpen())
+            self.assertIs(MySQLDB.get_pooled(host='localhost', user='unittest', db='unittest'), pooled1)
+
+            # Once closed, a new instance replaces the pooled one:
+            pooled1.close()
+            self.assertFalse(pooled1.ping())
+            pooled2 = MySQLDB.get_pooled(host='localhost', user='unittest', db='unittest')
+            self.assertIsNot(pooled2, pooled1)
+            self.assertTrue(pooled2.isOpen())
+
+            # Clearing the pool closes the pooled instances:
+            MySQLDB.clear_pool()
+            self.assertFalse(pooled2.isOpen())
+            self.assertIsNot(MySQLDB.get_pooled(host='localhost', user='unittest', db='unittest'), pooled2)
+        finally:
+            MySQLDB.clear_pool()
+
     # ----------------------- UTILITIES -------------------------
     
     #-------------------------
@@ -734,44 +977,127 @@ class TestPymysqlUtils(unittest.TestCase):
         ====      ======
         
         '''
+        self.tables_used.add('unittest')
         cur = self.mysqldb.connection.cursor()
         with no_warn_no_table():
             cur.execute('DROP TABLE IF EXISTS unittest')
         cur.execute('CREATE TABLE unittest (col1 INT, col2 TEXT)')
-        cur.execute("INSERT INTO unittest VALUES (10, 'col1')")
-        cur.execute("INSERT INTO unittest VALUES (20, 'col2')")
-        cur.execute("INSERT INTO unittest VALUES (30, 'col3')")
+        cur.execute("INSERT INTO unittest VALUES (10, 'col1'), (20, 'col2'), (30, 'col3')")
         self.mysqldb.connection.commit()
         cur.close()
         return 3
     
+    #-------------------------
+    # clear_password 
+    #--------------
+    
+    def clear_password(self):
+        '''
+        Remove the password that testWithMySQLPassword()
+        sets for user unittest. Runs as a cleanup, after
+        tearDown() closed the test's connection, so logs 
+        in anew.
+        '''
+        with MySQLDB(host='localhost', user='unittest', passwd='foobar', db='unittest') as mysqldb:
+            if self.mysql_ge_5_7:
+                mysqldb.execute("SET PASSWORD FOR unittest@localhost = ''")
+            else:
+                mysqldb.execute("SET PASSWORD FOR unittest@localhost = PASSWORD('')")
+
+    #-------------------------
+    # create_table 
+    #--------------
+    
+    def create_table(self, tbl_name, schema):
+        '''
+        Create a table via createTable(), and have
+        tearDown() drop it again.
+        
+        @param tbl_name: name of new table
+        @type tbl_name: str
+        @param schema: column names mapped to SQL types
+        @type schema: {str : str}
+        '''
+        self.tables_used.add(tbl_name)
+        self.mysqldb.createTable(tbl_name, schema)
+
+    #-------------------------
+    # get_dict_mysqldb 
+    #--------------
+    
+    def get_dict_mysqldb(self):
+        '''
+        Return a connection whose cursor class is
+        Cursors.DICT. The connection is opened on 
+        first use, and then shared by all tests.
+        
+        @return: connection returning rows as dicts
+        @rtype: MySQLDB
+        '''
+        if TestPymysqlUtils.shared_dict_mysqldb is None or \
+            not TestPymysqlUtils.shared_dict_mysqldb.isOpen():
+            TestPymysqlUtils.shared_dict_mysqldb = MySQLDB(host='localhost',
+                                                           user='unittest',
+                                                           db='unittest',
+                                                           cursor_class=Cursors.DICT)
+        return TestPymysqlUtils.shared_dict_mysqldb
+
+    #-------------------------
+    # fetch_one 
+    #--------------
+    
+    def fetch_one(self, query_str):
+        '''
+        Run a query over the shared connection's raw 
+        cursor, and return its first row. Sees what 
+        any of a test's connections committed. Like QueryResult.next(), return
+        the bare value for single-column rows. Cheaper
+        than query().next() for probing test results.
+        
+        @param query_str: query to run
+        @type query_str: str
+        @return: first result row, or None if no rows
+        '''
+        self.shared_cursor.execute(query_str)
+        row = self.shared_cursor.fetchone()
+        if row is not None and len(row) == 1:
+            return row[0]
+        return row
+
     #-------------------------
     # get_mysql_version 
     #--------------
     
     @classmethod  
-    def get_mysql_version(cls):
+    def get_mysql_version(cls, mysqldb):
         '''
-        Return a tuple: (major, minor). 
-        Example, for MySQL 5.7.15, return (5,7).
-        Return (None,None) if version number not found.
+        Return a tuple: (major, minor) of the MySQL
+        server's version. Example, for MySQL 5.7.15, 
+        return (5,7). Return (None,None) if version 
+        number not found. The result is computed once,
+        and then remembered.
 
+        @param mysqldb: open connection to the server
+        @type mysqldb: MySQLDB
         '''
-        
-        # Where is mysql client program?
-        mysql_path = MySQLDB.find_mysql_path()
+        if cls.mysql_version is not None:
+            return cls.mysql_version
       
         # Get version string, which looks like this:
-        #   'Distrib 5.7.15, for osx10.11 (x86_64) using  EditLine wrapper\n'
-        version_str = subprocess.check_output([mysql_path, '--version']).decode('utf-8')
+        #   '5.7.15-log', or '8.0.21'
+        version_str = mysqldb.connection.get_server_info()
+        if not isinstance(version_str, str):
+            version_str = version_str.decode('utf-8')
         
         # Isolate the major and minor version numbers (e.g. '5', and '7')
         pat = re.compile(r'([0-9]*)[.]([0-9]*)[.]')
         match_obj = pat.search(version_str)
         if match_obj is None:
-            return (None,None)
-        (major, minor) = match_obj.groups()
-        return (int(major), int(minor))
+            cls.mysql_version = (None,None)
+        else:
+            (major, minor) = match_obj.groups()
+            cls.mysql_version = (int(major), int(minor))
+        return cls.mysql_version
       
         
 #         self.mysqldb.dropTable('unittest')